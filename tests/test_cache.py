@@ -0,0 +1,76 @@
+"""Tests for the on-disk response cache decorator."""
+
+import asyncio
+
+import pytest
+
+from workflows.engine import cache
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "responses.sqlite"
+    monkeypatch.setenv(cache.CACHE_ENV_VAR, str(path))
+    return path
+
+def _counting_runner():
+    calls = []
+
+    @cache.cached
+    def run(prompt, model=None, system=None, stream=True, **kwargs):
+        calls.append(prompt)
+        return f"{prompt}#{len(calls)}"
+
+    return run, calls
+
+def test_identical_calls_hit_the_cache(cache_path):
+    run, calls = _counting_runner()
+    assert run("hi", model="m") == "hi#1"
+    assert run("hi", model="m") == "hi#1"
+    assert run("hi", model="other") == "hi#2"
+    assert run("hi", model="m", system="s") == "hi#3"
+    assert run("hi", model="m", temperature=0.5) == "hi#4"
+    assert calls == ["hi"] * 4
+
+def test_cache_false_always_calls_the_model(cache_path):
+    run, calls = _counting_runner()
+    run("hi")
+    assert run("hi", cache=False) == "hi#2"
+    assert len(calls) == 2
+
+def test_streaming_handler_bypasses_the_cache(cache_path):
+    run, calls = _counting_runner()
+    run("hi")
+    assert run("hi", handler=object()) == "hi#2"
+    assert run("hi", handler=None) == "hi#1"
+    assert len(calls) == 2
+
+def test_disabled_without_the_env_var(monkeypatch):
+    monkeypatch.delenv(cache.CACHE_ENV_VAR, raising=False)
+    run, calls = _counting_runner()
+    run("hi")
+    run("hi")
+    assert len(calls) == 2
+
+def test_async_runner_is_cached(cache_path):
+    calls = []
+
+    @cache.cached
+    async def run(prompt, model=None, system=None, stream=True, **kwargs):
+        calls.append(prompt)
+        await asyncio.sleep(0)
+        return f"{prompt}#{len(calls)}"
+
+    async def main():
+        first = await run("hi", model="m")
+        second = await run("hi", model="m")
+        uncached = await run("hi", model="m", cache=False)
+        return first, second, uncached
+
+    assert asyncio.run(main()) == ("hi#1", "hi#1", "hi#2")
+
+def test_cache_persists_across_processes_via_the_file(cache_path):
+    run, _ = _counting_runner()
+    run("hi", model="m")
+    # A fresh ResponseCache on the same file sees the stored response
+    key = cache.make_key("m", None, "hi", {})
+    assert cache.ResponseCache(cache_path).get(key) == "hi#1"
@@ -0,0 +1,54 @@
+"""Tests for the LLM runner's batching and OpenAI fast path."""
+
+import asyncio
+
+import pytest
+
+from workflows.engine import llm_runner
+
+async def _fake_run(prompt, **kwargs):
+    await asyncio.sleep(0)
+    if prompt == "bad":
+        raise ValueError("bad prompt")
+    return prompt.upper()
+
+def test_batch_raises_the_failure_itself(monkeypatch):
+    monkeypatch.setattr(llm_runner, "async_run_llm", _fake_run)
+    with pytest.raises(ValueError, match="bad prompt"):
+        llm_runner.batch_run_llm(["a", "bad", "c"])
+
+def test_batch_return_exceptions(monkeypatch):
+    monkeypatch.setattr(llm_runner, "async_run_llm", _fake_run)
+    results = llm_runner.batch_run_llm(["a", "bad"], return_exceptions=True)
+    assert results[0] == "A"
+    assert isinstance(results[1], ValueError)
+
+def test_openai_fast_path_retries_rate_limits(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    statuses = [429, 503, 200]
+    calls = []
+
+    class Client:
+        async def post(self, url, headers, json):
+            calls.append(json)
+            status = statuses[len(calls) - 1]
+            body = {"choices": [{"message": {"content": " ok "}}]} if status == 200 else {}
+            return httpx.Response(status, json=body, request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(llm_runner, "_get_client", lambda: Client())
+    monkeypatch.setattr(llm_runner, "_retry_delay", lambda attempt, retry_after=None: 0)
+    result = asyncio.run(llm_runner.async_run_llm_openai("hi", "gpt-4.1-mini", key="k"))
+    assert result == "ok"
+    assert len(calls) == 3
+
+def test_openai_fast_path_gives_up_after_retries(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+
+    class Client:
+        async def post(self, url, headers, json):
+            return httpx.Response(500, request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(llm_runner, "_get_client", lambda: Client())
+    monkeypatch.setattr(llm_runner, "_retry_delay", lambda attempt, retry_after=None: 0)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(llm_runner.async_run_llm_openai("hi", "gpt-4.1-mini", key="k"))
@@ -0,0 +1,50 @@
+"""Tests for the queued JSONL log writer."""
+
+import json
+import logging
+from decimal import Decimal
+
+from workflows.engine import logging as wf_logging
+
+def test_unserializable_record_is_skipped(tmp_path, capsys):
+    log_file = tmp_path / "run.jsonl"
+    for step, value in [("a", 1), ("b", Decimal("1.5")), ("c", 3)]:
+        wf_logging._LOG_Q.put((step, {"value": value}, 0, log_file))
+    wf_logging._LOG_Q.put(None)
+
+    # Run the drain loop inline; it returns at the stop sentinel
+    wf_logging._drain()
+    wf_logging.get_jsonl_logger(log_file).flush()
+
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [r["step"] for r in records] == ["a", "c"]
+    assert "'b'" in capsys.readouterr().err
+
+def test_setup_logging_quiets_http_clients(tmp_path, monkeypatch):
+    # Keep the drain thread stopped so other tests can run _drain inline
+    monkeypatch.setattr(wf_logging, "_ensure_drain", lambda: None)
+    root = logging.getLogger()
+    level, handlers = root.level, list(root.handlers)
+    log_file = tmp_path / "run.jsonl"
+    try:
+        root.setLevel(logging.INFO)
+        wf_logging.setup_logging(log_file)
+        logging.getLogger("httpx").info('HTTP Request: POST https://api.openai.com "HTTP/1.1 200 OK"')
+        wf_logging.get_jsonl_logger(log_file).flush()
+        assert "HTTP Request" not in log_file.read_text()
+    finally:
+        root.setLevel(level)
+        root.handlers[:] = handlers
+        logging.getLogger("httpx").setLevel(logging.NOTSET)
+
+def test_non_ascii_record_is_written_as_utf8(tmp_path):
+    log_file = tmp_path / "run.jsonl"
+    for step, value in [("a", "plain"), ("b", "café ✓"), ("c", "plain")]:
+        wf_logging._LOG_Q.put((step, {"value": value}, 0, log_file))
+    wf_logging._LOG_Q.put(None)
+
+    wf_logging._drain()
+    wf_logging.get_jsonl_logger(log_file).flush()
+
+    lines = log_file.read_bytes().decode("utf-8").splitlines()
+    assert [json.loads(line)["value"] for line in lines] == ["plain", "café ✓", "plain"]
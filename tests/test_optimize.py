@@ -0,0 +1,38 @@
+"""Tests for the evaluator's streamed JSON reader."""
+
+import json
+
+import pytest
+
+from workflows.workflows.optimize import read_json_object
+
+DOC = '{"score": 0.8, "feedback": "use \\"{braces}\\" and } carefully", "meta": {"n": [1, {"x": "}"}]}}'
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+@pytest.mark.parametrize("batch_size", [1, 5, 64])
+def test_reads_object_across_chunk_and_batch_splits(chunk_size, batch_size):
+    text = f"Sure, here it is: {DOC}\nHope that helps! {{\"not\": \"this\"}}"
+    result = read_json_object(_chunks(text, chunk_size), batch_size=batch_size)
+    assert result == DOC
+    assert json.loads(result)["feedback"] == 'use "{braces}" and } carefully'
+
+def test_quotes_before_the_object_are_not_strings():
+    text = 'The "answer" is: {"score": 1, "feedback": "ok"} done'
+    assert read_json_object(_chunks(text, 4), batch_size=1) == '{"score": 1, "feedback": "ok"}'
+
+def test_stops_reading_once_the_object_is_complete():
+    consumed = []
+
+    def stream():
+        for chunk in _chunks(DOC + " trailing text" * 50, 5):
+            consumed.append(chunk)
+            yield chunk
+
+    assert read_json_object(stream(), batch_size=5) == DOC
+    assert len("".join(consumed)) < len(DOC) + 10
+
+def test_incomplete_object_returns_everything_read():
+    assert read_json_object(["  no json ", '{"score": 1'], batch_size=1) == 'no json {"score": 1'
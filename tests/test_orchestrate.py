@@ -0,0 +1,26 @@
+"""Tests for the orchestrator-workers workflow."""
+
+import json
+
+from typer.testing import CliRunner
+
+from workflows.workflows import orchestrate
+
+def test_task_without_prompt_is_dropped(monkeypatch, tmp_path):
+    plan = {"tasks": [{"id": 1, "prompt": "one"}, {"id": 2}], "aggregate_prompt": None}
+
+    def fake_run_llm(prompt, system=None, **kwargs):
+        if system == orchestrate.ORCHESTRATOR_SYSTEM_PROMPT:
+            return json.dumps(plan)
+        return f"final:{prompt}"
+
+    def fake_batch(prompts, **kwargs):
+        return [f"done:{p}" for p in prompts]
+
+    monkeypatch.setattr(orchestrate, "run_llm", fake_run_llm)
+    monkeypatch.setattr(orchestrate, "batch_run_llm", fake_batch)
+    monkeypatch.setattr(orchestrate, "log_step", lambda step, data, log_file=None: None)
+
+    result = CliRunner().invoke(orchestrate.app, ["--prompt", "do it", "--model", "m"])
+    assert result.exit_code == 0, result.output
+    assert "final:done:one" in result.output
@@ -0,0 +1,59 @@
+"""Tests for parallel sectioning."""
+
+import random
+import re
+
+import pytest
+
+from workflows.workflows.parallel import section_by_regex, section_by_size_bytes
+
+PATTERNS = [
+    r"(?m)^## \w+",
+    r"(?m)^\w+ \d",
+    r"(?m)^#",
+    r"\b\w",
+    r"\s+",
+    r"\d+",
+    r"#+",
+]
+
+@pytest.mark.parametrize("size", [0, -2])
+def test_size_sections_reject_nonpositive_size(size):
+    with pytest.raises(ValueError):
+        next(section_by_size_bytes(memoryview(b"abc"), size))
+
+def test_size_sections_keep_utf8_characters_whole():
+    data = "aé€😀b".encode()
+    chunks = [bytes(c) for c in section_by_size_bytes(memoryview(data), 2)]
+    assert b"".join(chunks) == data
+    assert [c.decode() for c in chunks] == ["a", "é", "€", "😀", "b"]
+
+def _re_sections(text: str, pattern: str) -> list:
+    """Reference splitter using only the stdlib re engine."""
+    starts = [m.start() for m in re.finditer(pattern, text)]
+    bounds = [0] + [s for s in starts if s > 0] + [len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:]) if b > a]
+
+def test_unicode_headers_split_like_re():
+    text = "## Café\nerster\n## Über\nzweiter\n"
+    assert list(section_by_regex(text, r"(?m)^## \w+")) == [
+        "## Café\nerster\n",
+        "## Über\nzweiter\n",
+    ]
+
+def test_unicode_word_digit_split_like_re():
+    text = "Größe 1\nviel\nÄpfel 2\nwenig\n"
+    assert list(section_by_regex(text, r"(?m)^\w+ \d")) == [
+        "Größe 1\nviel\n",
+        "Äpfel 2\nwenig\n",
+    ]
+
+@pytest.mark.parametrize("alphabet", ["ab #\n1_", "ab #\n1_éÜ٣ß "])
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_matches_stdlib_re(pattern, alphabet):
+    rng = random.Random(f"{pattern}|{alphabet}")
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(40)))
+        sections = list(section_by_regex(text, pattern))
+        assert sections == _re_sections(text, pattern)
+        assert "".join(sections) == text
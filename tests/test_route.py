@@ -0,0 +1,15 @@
+"""Tests for the routing workflow."""
+
+from workflows.workflows.route import _fused_prompt
+
+def test_fused_prompt_survives_a_bad_unrelated_template(capsys):
+    routes = {
+        "code": {"template": "Explain: {input}"},
+        "json": {"template": 'Reply with {"answer": ...} for {input}'},
+        "other": {"template": "Use {0} for {input}"},
+    }
+    prompt = _fused_prompt("hi", routes)
+    assert "Task: Explain: hi" in prompt
+    assert 'Task: Reply with {"answer": ...} for {input}' in prompt
+    err = capsys.readouterr().err
+    assert "'json'" in err and "'other'" in err
@@ -0,0 +1,19 @@
+"""Tests for the JSON helpers."""
+
+import pytest
+
+from workflows.engine import serialization
+
+DOCS = [
+    ["Café", "Über\n\"quoted\"", "", "日本語 😀"],
+    {"label": "naïve", "items": [1, 2.5, None, True]},
+    [],
+]
+
+@pytest.mark.parametrize("indent", [False, True])
+@pytest.mark.parametrize("doc", DOCS)
+def test_dumps_matches_across_backends(doc, indent, monkeypatch):
+    pytest.importorskip("orjson")
+    fast = serialization.dumps(doc, indent=indent)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.dumps(doc, indent=indent) == fast
@@ -0,0 +1,28 @@
+"""Tests for StreamHandler output."""
+
+import sys
+
+import pytest
+
+from workflows.engine.streaming import StreamHandler
+
+class _Stdout:
+    def __init__(self):
+        self.parts = []
+        self.flushes = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def flush(self):
+        self.flushes.append("".join(self.parts))
+
+@pytest.mark.parametrize("buffer", [False, True])
+def test_stdout_is_flushed_per_line(monkeypatch, buffer):
+    out = _Stdout()
+    monkeypatch.setattr(sys, "stdout", out)
+    handler = StreamHandler(buffer=buffer)
+    for chunk in ["par", "tial", " line\nnext", " words"]:
+        handler.write(chunk)
+    assert out.flushes == ["partial line\nnext"]
+    assert "".join(out.parts) == "partial line\nnext words"
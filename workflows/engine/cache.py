@@ -0,0 +1,136 @@
+"""Deterministic on-disk cache for LLM responses."""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable
+
+# Path of the SQLite cache database; caching is disabled when unset
+CACHE_ENV_VAR = "WORKFLOWS_CACHE"
+
+def make_key(
+    model: Optional[str],
+    system: Optional[str],
+    prompt: str,
+    kwargs: Dict[str, Any],
+) -> str:
+    """Build the cache key for an LLM call.
+
+    Args:
+        model: Model name
+        system: System prompt
+        prompt: User prompt
+        kwargs: Additional llm options
+
+    Returns:
+        Hex SHA-256 digest identifying the call
+    """
+    payload = json.dumps([model, system, prompt, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResponseCache:
+    """SQLite store mapping call keys to response text."""
+
+    def __init__(self, path: Path):
+        """Open (and create if needed) the cache database.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, ts INT)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        """Store the response for a key."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, ts) VALUES (?, ?, ?)",
+                (key, value, int(time.time())),
+            )
+            self._conn.commit()
+
+_CACHES: Dict[str, ResponseCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the cache configured via $WORKFLOWS_CACHE, or None if disabled."""
+    path = os.environ.get(CACHE_ENV_VAR)
+    if not path:
+        return None
+    with _CACHES_LOCK:
+        if path not in _CACHES:
+            _CACHES[path] = ResponseCache(Path(path).expanduser())
+        return _CACHES[path]
+
+def cached(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorate an LLM runner so identical calls are served from the cache.
+
+    The wrapped function accepts an extra ``cache`` keyword (default True);
+    pass ``cache=False`` where repeated calls must reach the model, e.g. voting.
+    Calls with a streaming ``handler`` attached always reach the model, since
+    a cache hit would produce no real-time output. Sync and async runners are
+    both supported.
+    """
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(
+            prompt: str,
+            model: Optional[str] = None,
+            system: Optional[str] = None,
+            stream: bool = True,
+            cache: bool = True,
+            **kwargs: Any,
+        ) -> str:
+            store = get_cache() if cache else None
+            if store is None:
+                return await fn(prompt, model=model, system=system, stream=stream, **kwargs)
+            key = make_key(model, system, prompt, kwargs)
+            hit = store.get(key)
+            if hit is not None:
+                return hit
+            result = await fn(prompt, model=model, system=system, stream=stream, **kwargs)
+            store.set(key, result)
+            return result
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(
+        prompt: str,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        stream: bool = True,
+        cache: bool = True,
+        **kwargs: Any,
+    ) -> str:
+        store = get_cache() if cache and kwargs.get("handler") is None else None
+        if store is None:
+            return fn(prompt, model=model, system=system, stream=stream, **kwargs)
+        # An explicit handler=None does not change the response
+        options = {k: v for k, v in kwargs.items() if k != "handler"}
+        key = make_key(model, system, prompt, options)
+        hit = store.get(key)
+        if hit is not None:
+            return hit
+        result = fn(prompt, model=model, system=system, stream=stream, **kwargs)
+        store.set(key, result)
+        return result
+    return wrapper
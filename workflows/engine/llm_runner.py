@@ -1,30 +1,223 @@
 """Thin wrapper around subprocess / llm Python API."""
 
+import asyncio
+import builtins
+import hashlib
+import os
+import random
+import shutil
 import subprocess
-from typing import Optional, List, Dict, Any
-import json
+import sys
+import tempfile
+import weakref
+from typing import Optional, List, Dict, Any, Iterator
 
-def run_llm(
+try:
+    import llm
+except ImportError:
+    llm = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import uvloop  # libuv-based event loop; not available on Windows
+except ImportError:
+    uvloop = None
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+from .cache import cached
+from .serialization import JSONDecodeError, loads
+from .streaming import StreamHandler
+
+# Resolved llm model instances, keyed by requested name (None = llm's default)
+_MODEL_CACHE: Dict[Optional[str], Any] = {}
+# Async counterparts; None marks a model with no async implementation
+_ASYNC_MODEL_CACHE: Dict[Optional[str], Any] = {}
+
+def _get_model(name: Optional[str] = None) -> Any:
+    """Return the llm model instance for a name, resolving it only once.
+
+    Args:
+        name: Model name or alias, or None for llm's default model
+
+    Returns:
+        The cached llm model instance
+    """
+    if name not in _MODEL_CACHE:
+        _MODEL_CACHE[name] = llm.get_model(name) if name else llm.get_model()
+    return _MODEL_CACHE[name]
+
+def _get_async_model(name: Optional[str] = None) -> Any:
+    """Return the async llm model instance for a name, if the plugin provides one.
+
+    Args:
+        name: Model name or alias, or None for llm's default model
+
+    Returns:
+        The cached async model instance, or None if no async variant exists
+    """
+    if name not in _ASYNC_MODEL_CACHE:
+        try:
+            _ASYNC_MODEL_CACHE[name] = llm.get_async_model(name) if name else llm.get_async_model()
+        except (AttributeError, llm.UnknownModelError):
+            _ASYNC_MODEL_CACHE[name] = None
+    return _ASYNC_MODEL_CACHE[name]
+
+# llm CLI executable for the subprocess fallback, resolved from PATH once
+_LLM_BIN = shutil.which("llm") or "llm"
+
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+# llm options that map one-to-one onto chat completion request fields
+_OPENAI_PASSTHROUGH_OPTIONS = {
+    "temperature", "max_tokens", "top_p", "frequency_penalty", "presence_penalty", "seed", "stop",
+}
+
+# Retry policy of the openai SDK that llm would otherwise use: two retries
+# with exponential backoff on timeouts, conflicts, rate limits and 5xx
+_OPENAI_MAX_RETRIES = 2
+_OPENAI_RETRY_STATUS = {408, 409, 429}
+
+# One pooled HTTP client per event loop; connections cannot outlive their loop
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+def _get_client() -> Any:
+    """Return the keep-alive HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=120,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+        )
+        _CLIENTS[loop] = client
+    return client
+
+async def _aclose_client() -> None:
+    """Close the running loop's HTTP client, if one was opened."""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+def _prompt_cache_key(*parts: str) -> str:
+    """Stable OpenAI prompt_cache_key for requests sharing a prompt prefix."""
+    return hashlib.blake2b("\0".join(parts).encode(), digest_size=16).hexdigest()
+
+def _openai_model_name(async_model: Any, options: Dict[str, Any]) -> Optional[str]:
+    """Return the API model name if a call can go straight to api.openai.com.
+
+    Only llm's built-in OpenAI chat models, with default endpoint settings and
+    plain sampling options, qualify; everything else goes through llm.
+    """
+    try:
+        from llm.default_plugins.openai_models import AsyncChat
+    except ImportError:
+        return None
+    if not isinstance(async_model, AsyncChat):
+        return None
+    # A proxy or gateway configured for the openai SDK must not be bypassed
+    if os.environ.get("OPENAI_BASE_URL"):
+        return None
+    if any(getattr(async_model, attr, None) for attr in ("api_base", "api_type", "api_version", "api_engine", "headers")):
+        return None
+    if not set(options) <= _OPENAI_PASSTHROUGH_OPTIONS:
+        return None
+    return async_model.model_name or async_model.model_id
+
+def _openai_headers(key: str) -> Dict[str, str]:
+    """Request headers, including the org/project the openai SDK reads from the env."""
+    headers = {"Authorization": f"Bearer {key}"}
+    if os.environ.get("OPENAI_ORG_ID"):
+        headers["OpenAI-Organization"] = os.environ["OPENAI_ORG_ID"]
+    if os.environ.get("OPENAI_PROJECT_ID"):
+        headers["OpenAI-Project"] = os.environ["OPENAI_PROJECT_ID"]
+    return headers
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry number attempt + 1.
+
+    Honours a short numeric Retry-After from the server, else backs off
+    exponentially from 0.5s (capped at 8s) with jitter.
+    """
+    try:
+        if retry_after is not None and 0 <= float(retry_after) <= 60:
+            return float(retry_after)
+    except ValueError:
+        pass
+    return min(0.5 * 2 ** attempt, 8.0) * random.uniform(0.75, 1.0)
+
+async def async_run_llm_openai(
     prompt: str,
-    model: Optional[str] = None,
+    model: str,
     system: Optional[str] = None,
-    stream: bool = True,
+    key: Optional[str] = None,
+    cache_prefix: Optional[str] = None,
     **kwargs: Any,
 ) -> str:
-    """Run an LLM command and return its output.
-    
+    """POST a prompt directly to OpenAI chat completions over the pooled client.
+
+    Rate limits (429), server errors (5xx) and dropped connections are
+    retried with backoff, as the openai SDK does.
+
     Args:
         prompt: The prompt to send to the LLM
-        model: Optional model override
+        model: OpenAI API model name
         system: Optional system prompt
-        stream: Whether to stream the output
-        **kwargs: Additional arguments to pass to llm
-        
+        key: API key (default: the key llm has configured for openai)
+        cache_prefix: Leading part of prompt shared by a batch of calls
+        **kwargs: Additional request body fields
+
     Returns:
         The LLM's response as a string
     """
-    # Always use subprocess fallback for robust CLI model resolution
-    cmd = ["llm", "prompt"]
+    if key is None:
+        key = llm.get_key(None, "openai", "OPENAI_API_KEY")
+    # System prompt always comes first so identical prefixes hit the provider cache
+    messages = []
+    body = {"model": model, "messages": messages, **kwargs}
+    if system:
+        messages.append({"role": "system", "content": system})
+    if system or cache_prefix:
+        # Calls sharing system prompt and prompt prefix land on the same cache
+        parts = [system or ""]
+        if cache_prefix:
+            parts.append(cache_prefix)
+        body.setdefault("prompt_cache_key", _prompt_cache_key(*parts))
+    messages.append({"role": "user", "content": prompt})
+    client = _get_client()
+    headers = _openai_headers(key)
+    for attempt in range(_OPENAI_MAX_RETRIES + 1):
+        last_attempt = attempt == _OPENAI_MAX_RETRIES
+        try:
+            response = await client.post(OPENAI_CHAT_URL, headers=headers, json=body)
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        status = response.status_code
+        if not last_attempt and (status in _OPENAI_RETRY_STATUS or status >= 500):
+            await asyncio.sleep(_retry_delay(attempt, response.headers.get("retry-after")))
+            continue
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+
+def _llm_command(
+    prompt: str,
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    stream: bool = True,
+) -> List[str]:
+    """Build the llm CLI invocation used when the Python package is not importable."""
+    cmd = [_LLM_BIN, "prompt"]
     if model:
         cmd.extend(["--model", model])
     if system:
@@ -32,11 +225,301 @@ def run_llm(
     if not stream:
         cmd.append("--no-stream")
     cmd.append(prompt)
-    
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        check=True
+    return cmd
+
+def _stream_subprocess(cmd: List[str]) -> Iterator[str]:
+    """Run a command and yield its stdout line by line as it is produced.
+
+    stderr goes to a temporary file rather than a pipe, so a child that
+    writes more than a pipe buffer of diagnostics cannot block while
+    stdout is still being read.
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits non-zero
+    """
+    with tempfile.TemporaryFile(mode="w+") as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, text=True, bufsize=1)
+        try:
+            yield from proc.stdout
+            proc.wait()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+        err.seek(0)
+        stderr = err.read()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+async def _async_subprocess(cmd: List[str]) -> str:
+    """Run a command on the event loop and return its stripped stdout.
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits non-zero
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(
+            proc.returncode, cmd, output=stdout.decode(), stderr=stderr.decode()
+        )
+    return stdout.decode().strip()
+
+@cached
+def run_llm(
+    prompt: str,
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    stream: bool = True,
+    handler: Optional[StreamHandler] = None,
+    **kwargs: Any,
+) -> str:
+    """Run an LLM command and return its output.
+
+    Args:
+        prompt: The prompt to send to the LLM
+        model: Optional model override
+        system: Optional system prompt
+        stream: Whether to stream the output
+        handler: Optional StreamHandler that receives the output as it arrives
+        **kwargs: Additional arguments to pass to llm
+
+    Returns:
+        The LLM's response as a string
+    """
+    if llm is not None:
+        response = _get_model(model).prompt(prompt, system=system, stream=stream, **kwargs)
+        if handler is None:
+            return response.text().strip()
+        chunks = []
+        for chunk in response:
+            handler.write(chunk)
+            chunks.append(chunk)
+        return "".join(chunks).strip()
+
+    # Fall back to the llm CLI when the Python package is not importable
+    lines = []
+    for line in _stream_subprocess(_llm_command(prompt, model, system, stream)):
+        if handler is not None:
+            handler.write(line)
+        lines.append(line)
+    return "".join(lines).strip()
+
+def stream_llm(
+    prompt: str,
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    **kwargs: Any,
+) -> Iterator[str]:
+    """Run an LLM prompt and yield the response text as it arrives.
+
+    Closing the generator early stops consuming the response.
+
+    Args:
+        prompt: The prompt to send to the LLM
+        model: Optional model override
+        system: Optional system prompt
+        **kwargs: Additional arguments to pass to llm
+
+    Yields:
+        Chunks of the LLM's response
+    """
+    if llm is not None:
+        yield from _get_model(model).prompt(prompt, system=system, stream=True, **kwargs)
+    else:
+        yield from _stream_subprocess(_llm_command(prompt, model, system))
+
+def run_llm_choice(
+    prompt: str,
+    choices: List[str],
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    **kwargs: Any,
+) -> str:
+    """Ask the LLM to pick one of a fixed set of strings.
+
+    When the model supports structured output, the request carries a JSON
+    schema whose only field is an enum of the choices, which usually keeps
+    the answer to a valid choice. Not every provider enforces the enum
+    (llm's OpenAI plugin does not request strict mode), so the caller must
+    still validate the result, as it must for models that get a plain
+    prompt and return their stripped text answer.
+
+    Args:
+        prompt: The prompt to send to the LLM
+        choices: The allowed answers
+        model: Optional model override
+        system: Optional system prompt
+        **kwargs: Additional arguments to pass to llm
+
+    Returns:
+        The chosen string
+    """
+    if llm is not None:
+        llm_model = _get_model(model)
+        if getattr(llm_model, "supports_schema", False):
+            schema = {
+                "type": "object",
+                "properties": {"choice": {"type": "string", "enum": list(choices)}},
+                "required": ["choice"],
+                "additionalProperties": False,
+            }
+            text = llm_model.prompt(prompt, system=system, schema=schema, **kwargs).text()
+            try:
+                return loads(text)["choice"]
+            except (JSONDecodeError, KeyError, TypeError):
+                # Providers that ignore the schema may still answer in plain text
+                return text.strip()
+    return run_llm(prompt, model=model, system=system, stream=False, **kwargs)
+
+@cached
+async def async_run_llm(
+    prompt: str,
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    stream: bool = True,
+    cache_prefix: Optional[str] = None,
+    **kwargs: Any,
+) -> str:
+    """Run an LLM prompt without blocking the event loop.
+
+    Uses llm's async model API when the plugin provides one, so concurrent
+    calls overlap their network latency on a single thread. Plain OpenAI
+    chat models skip llm's per-call client setup and use a pooled HTTP/2
+    connection when httpx is installed. The llm CLI fallback runs as an
+    asyncio subprocess. Only a plugin with no async model falls back to
+    running the synchronous run_llm in a worker thread.
+
+    Args:
+        prompt: The prompt to send to the LLM
+        model: Optional model override
+        system: Optional system prompt
+        stream: Whether to stream the output
+        cache_prefix: Leading part of prompt shared by a batch of calls; lets
+            the OpenAI fast path send them with one prompt_cache_key
+        **kwargs: Additional arguments to pass to llm
+
+    Returns:
+        The LLM's response as a string
+    """
+    if llm is None:
+        return await _async_subprocess(_llm_command(prompt, model, system, stream))
+    async_model = _get_async_model(model)
+    if async_model is not None:
+        openai_model = _openai_model_name(async_model, kwargs) if httpx is not None else None
+        if openai_model is not None:
+            return await async_run_llm_openai(
+                prompt,
+                openai_model,
+                system=system,
+                key=async_model.get_key(),
+                cache_prefix=cache_prefix,
+                **kwargs,
+            )
+        response = async_model.prompt(prompt, system=system, stream=stream, **kwargs)
+        return (await response.text()).strip()
+    return await asyncio.to_thread(
+        run_llm, prompt, model=model, system=system, stream=stream, cache=False, **kwargs
     )
-    return result.stdout.strip() 
\ No newline at end of file
+
+async def async_batch_run_llm(
+    prompts: List[str],
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    return_exceptions: bool = False,
+    **kwargs: Any,
+) -> List[Any]:
+    """Run several prompts concurrently against the same model.
+
+    Args:
+        prompts: Prompts to run
+        model: Optional model override
+        system: Optional system prompt shared by every prompt
+        max_concurrency: Maximum number of requests in flight (default: unbounded)
+        return_exceptions: Return failures in place of results instead of raising
+        **kwargs: Additional arguments to pass to async_run_llm
+
+    Returns:
+        Responses in the same order as prompts
+    """
+    sem = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    async def run_one(prompt: str) -> Any:
+        try:
+            if sem is None:
+                return await async_run_llm(prompt, model=model, system=system, **kwargs)
+            async with sem:
+                return await async_run_llm(prompt, model=model, system=system, **kwargs)
+        except Exception as e:
+            if return_exceptions:
+                return e
+            raise
+    if sys.version_info >= (3, 11):
+        # A failure cancels the rest of the batch instead of leaving it running
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(run_one(prompt)) for prompt in prompts]
+        # Looked up via builtins because the name does not exist before 3.11
+        except builtins.BaseExceptionGroup as group:
+            # Raise the first failure itself, as gather does on 3.10
+            raise group.exceptions[0] from None
+        return [task.result() for task in tasks]
+    return await asyncio.gather(*(run_one(prompt) for prompt in prompts))
+
+def batch_run_llm(
+    prompts: List[str],
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    return_exceptions: bool = False,
+    **kwargs: Any,
+) -> List[Any]:
+    """Synchronous entry point for async_batch_run_llm.
+
+    All requests share one event loop, so the provider client can reuse
+    its keep-alive connections across the batch.
+
+    Args:
+        prompts: Prompts to run
+        model: Optional model override
+        system: Optional system prompt shared by every prompt
+        max_concurrency: Maximum number of requests in flight (default: unbounded)
+        return_exceptions: Return failures in place of results instead of raising
+        **kwargs: Additional arguments to pass to async_run_llm
+
+    Returns:
+        Responses in the same order as prompts
+    """
+    return run_async(async_batch_run_llm(
+        prompts,
+        model=model,
+        system=system,
+        max_concurrency=max_concurrency,
+        return_exceptions=return_exceptions,
+        **kwargs,
+    ))
+
+def run_async(coro: Any) -> Any:
+    """Run a coroutine to completion on a new event loop.
+
+    Like asyncio.run, but also closes the pooled HTTP client the loop
+    opened, since its connections cannot be reused by a later loop.
+    Uses uvloop's faster event loop when it is installed.
+
+    Args:
+        coro: The coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    async def main() -> Any:
+        try:
+            return await coro
+        finally:
+            await _aclose_client()
+    if uvloop is not None:
+        return uvloop.run(main())
+    return asyncio.run(main())
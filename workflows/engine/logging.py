@@ -1,17 +1,182 @@
 """Structured JSON + txt logs."""
 
-import json
+import atexit
 import logging
-from typing import Optional, Dict, Any
+import queue
+import sys
+import threading
+import time
+from typing import Optional, Dict, Any, List
 from pathlib import Path
-from datetime import datetime
+
+from .serialization import dumps
+
+class JsonlLogger:
+    """Buffered JSONL writer that keeps its log file open for the whole run."""
+
+    def __init__(self, path: Path, buffer_size: int = 8192):
+        """Open the log file for appending.
+
+        Args:
+            path: Path of the JSONL file
+            buffer_size: Write buffer size in bytes
+        """
+        self.path = path
+        # dumps emits raw UTF-8 text, so never fall back to the locale encoding
+        self._fh = open(path, "a", buffering=buffer_size, encoding="utf-8")
+        self._lock = threading.Lock()
+
+    @property
+    def stream(self):
+        """The underlying text stream."""
+        return self._fh
+
+    def write(self, obj: Dict[str, Any]) -> None:
+        """Append one record as a compact JSON line.
+
+        Args:
+            obj: The record to write
+        """
+        line = dumps(obj) + "\n"
+        with self._lock:
+            self._fh.write(line)
+
+    def write_lines(self, lines: List[str]) -> None:
+        """Append already-serialized records with a single locked write.
+
+        Args:
+            lines: JSON records, one per item, without trailing newlines
+        """
+        text = "\n".join(lines) + "\n"
+        with self._lock:
+            self._fh.write(text)
+
+    def flush(self) -> None:
+        """Flush buffered records to disk."""
+        with self._lock:
+            self._fh.flush()
+
+    def close(self) -> None:
+        """Flush and close the log file."""
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+# One open writer per log path for the lifetime of the process
+_LOGGERS: Dict[Path, JsonlLogger] = {}
+_LOGGERS_LOCK = threading.Lock()
+
+def get_jsonl_logger(log_file: Path) -> JsonlLogger:
+    """Return the shared writer for a log file, opening it on first use.
+
+    Args:
+        log_file: Path of the JSONL file
+
+    Returns:
+        The writer for that path
+    """
+    with _LOGGERS_LOCK:
+        if log_file not in _LOGGERS:
+            _LOGGERS[log_file] = JsonlLogger(log_file)
+        return _LOGGERS[log_file]
+
+# (UTC day number, "YYYY-MM-DDT") of the last formatted timestamp
+_DAY_PREFIX = (-1, "")
+
+def _format_timestamp(ts_ns: int) -> str:
+    """Format a time.time_ns() value as a UTC ISO-8601 timestamp.
+
+    Only the time of day is formatted per record; the date part is
+    recomputed once per day.
+    """
+    global _DAY_PREFIX
+    seconds, micros = divmod(ts_ns // 1000, 1_000_000)
+    day, sec_of_day = divmod(seconds, 86400)
+    if day != _DAY_PREFIX[0]:
+        _DAY_PREFIX = (day, time.strftime("%Y-%m-%dT", time.gmtime(seconds)))
+    hours, rem = divmod(sec_of_day, 3600)
+    minutes, secs = divmod(rem, 60)
+    return "%s%02d:%02d:%02d.%06d" % (_DAY_PREFIX[1], hours, minutes, secs, micros)
+
+# Pending (step, data, timestamp, log_file) records; None stops the drain thread
+_LOG_Q: "queue.SimpleQueue[Optional[tuple]]" = queue.SimpleQueue()
+# Most records the drain thread writes per batch
+_DRAIN_BATCH = 64
+_DRAIN_THREAD: Optional[threading.Thread] = None
+_DRAIN_LOCK = threading.Lock()
+
+def _drain() -> None:
+    """Serialize and write queued log records until the stop sentinel arrives.
+
+    After blocking for one record, whatever else is already queued (up to
+    _DRAIN_BATCH records) is taken too and written to each file in one go.
+    A record that cannot be serialized is reported on stderr and skipped;
+    it never takes the rest of the batch or the thread down with it.
+    """
+    running = True
+    while running:
+        batch = [_LOG_Q.get()]
+        while len(batch) < _DRAIN_BATCH:
+            try:
+                batch.append(_LOG_Q.get_nowait())
+            except queue.Empty:
+                break
+
+        by_file: Dict[Path, List[str]] = {}
+        for item in batch:
+            if item is None:
+                running = False
+                break
+            step, data, ts, log_file = item
+            try:
+                line = dumps({
+                    "timestamp": _format_timestamp(ts),
+                    "step": step,
+                    **data,
+                })
+            except Exception as e:
+                sys.stderr.write(f"workflows: dropped log record for step {step!r}: {e}\n")
+                continue
+            if log_file:
+                by_file.setdefault(log_file, []).append(line)
+            else:
+                logging.info(line)
+        for log_file, lines in by_file.items():
+            try:
+                get_jsonl_logger(log_file).write_lines(lines)
+            except Exception as e:
+                sys.stderr.write(f"workflows: failed to write log {log_file}: {e}\n")
+
+def _ensure_drain() -> None:
+    """Start the background drain thread if it is not running yet."""
+    global _DRAIN_THREAD
+    if _DRAIN_THREAD is not None:
+        return
+    with _DRAIN_LOCK:
+        if _DRAIN_THREAD is None:
+            _DRAIN_THREAD = threading.Thread(target=_drain, name="workflows-log", daemon=True)
+            _DRAIN_THREAD.start()
+
+@atexit.register
+def _shutdown() -> None:
+    """Write out every queued record, then close the log files."""
+    if _DRAIN_THREAD is not None:
+        _LOG_Q.put(None)
+        _DRAIN_THREAD.join()
+    with _LOGGERS_LOCK:
+        for logger in _LOGGERS.values():
+            logger.close()
+
+# HTTP client libraries used by llm plugins log each request at INFO (and
+# DEBUG); their lines would land in the JSONL log between real records
+_HTTP_CLIENT_LOGGERS = ("httpx", "httpcore", "openai")
 
 def setup_logging(
     log_file: Optional[Path] = None,
     verbose: bool = False,
 ) -> None:
     """Set up logging configuration.
-    
+
     Args:
         log_file: Optional path to write JSONL logs
         verbose: Whether to enable verbose logging
@@ -21,10 +186,14 @@ def setup_logging(
         level=logging.DEBUG if verbose else logging.INFO,
         format="%(message)s",
     )
-    
-    # Add JSONL file handler if specified
+    _ensure_drain()
+    for name in _HTTP_CLIENT_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    # Route log records through the same handle log_step writes to, so both
+    # share one buffer instead of interleaving writes from two open files
     if log_file:
-        handler = logging.FileHandler(log_file)
+        handler = logging.StreamHandler(get_jsonl_logger(log_file).stream)
         handler.setFormatter(logging.Formatter("%(message)s"))
         logging.getLogger().addHandler(handler)
 
@@ -34,20 +203,15 @@ def log_step(
     log_file: Optional[Path] = None,
 ) -> None:
     """Log a workflow step.
-    
+
+    The record is queued and written by a background thread, so this
+    returns without serializing or touching the log file.
+
     Args:
         step: Step name/identifier
         data: Step data to log
         log_file: Optional path to write JSONL logs
     """
-    entry = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "step": step,
-        **data,
-    }
-    
-    if log_file:
-        with open(log_file, "a") as f:
-            f.write(json.dumps(entry) + "\n")
-    else:
-        logging.info(json.dumps(entry)) 
\ No newline at end of file
+    # Serialization and file I/O happen on the drain thread
+    _ensure_drain()
+    _LOG_Q.put_nowait((step, data, time.time_ns(), log_file))
@@ -1,12 +1,17 @@
 """Model resolution and fallbacks."""
 
+import functools
 import os
 from typing import Optional
 
 DEFAULT_MODEL = "gpt-4.1-mini"
 
+@functools.lru_cache(maxsize=8)
 def resolve_model(model: Optional[str] = None) -> str:
     """Resolve the model to use, with fallbacks.
+
+    Results are memoized, so $LLM_MODEL is read once per process; call
+    resolve_model.cache_clear() after changing it.
     
     Args:
         model: Optional model override
@@ -0,0 +1,89 @@
+"""JSON encoding, decoding and schema validation with optional fast backends."""
+
+import json
+from typing import Any, Callable, Dict, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both backends
+JSONDecodeError = json.JSONDecodeError
+
+class SchemaValidationError(ValueError):
+    """Raised when a document does not match a JSON schema."""
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document, using orjson when installed.
+
+    Args:
+        data: JSON text or UTF-8 bytes
+
+    Returns:
+        The decoded object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize an object to JSON, using orjson when installed.
+
+    Args:
+        obj: The object to serialize
+        indent: Pretty-print with two-space indentation instead of compact output
+
+    Returns:
+        The JSON text
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode()
+    # ensure_ascii=False writes raw UTF-8 like orjson, so output is the
+    # same whichever backend is installed
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], Any]:
+    """Build a validator for a JSON schema once, for reuse on every document.
+
+    Uses fastjsonschema when installed, then jsonschema. With neither installed
+    the validator accepts any decoded document.
+
+    Args:
+        schema: The JSON schema
+
+    Returns:
+        A callable that raises SchemaValidationError for invalid documents
+    """
+    if fastjsonschema is not None:
+        compiled = fastjsonschema.compile(schema)
+        def validate(doc: Any) -> Any:
+            try:
+                return compiled(doc)
+            except fastjsonschema.JsonSchemaException as e:
+                raise SchemaValidationError(str(e)) from e
+        return validate
+
+    try:
+        import jsonschema
+    except ImportError:
+        return lambda doc: doc
+
+    validator = jsonschema.validators.validator_for(schema)(schema)
+    def validate(doc: Any) -> Any:
+        try:
+            validator.validate(doc)
+        except jsonschema.ValidationError as e:
+            raise SchemaValidationError(e.message) from e
+        return doc
+    return validate
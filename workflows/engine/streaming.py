@@ -1,5 +1,6 @@
 """Unified stdout/err streaming & capture."""
 
+import io
 import sys
 from typing import Optional, TextIO, Callable
 from contextlib import contextmanager
@@ -12,6 +13,7 @@ class StreamHandler:
         stream: bool = True,
         file: Optional[TextIO] = None,
         callback: Optional[Callable[[str], None]] = None,
+        buffer: bool = True,
     ):
         """Initialize the stream handler.
         
@@ -19,11 +21,14 @@ class StreamHandler:
             stream: Whether to stream to stdout
             file: Optional file to write to
             callback: Optional callback for each chunk
+            buffer: Whether to keep written text for getvalue()
         """
         self.stream = stream
         self.file = file
         self.callback = callback
-        self._buffer = []
+        self._buffer = io.StringIO() if buffer else None
+        # Plain stdout passthrough needs none of the per-chunk checks below
+        self._stdout_only = stream and file is None and callback is None and not buffer
         
     def write(self, text: str) -> None:
         """Write text to all configured outputs.
@@ -31,9 +36,17 @@ class StreamHandler:
         Args:
             text: The text to write
         """
+        if self._stdout_only:
+            sys.stdout.write(text)
+            if "\n" in text:
+                sys.stdout.flush()
+            return
+
         if self.stream:
             sys.stdout.write(text)
-            sys.stdout.flush()
+            # Flush per line rather than per chunk
+            if "\n" in text:
+                sys.stdout.flush()
             
         if self.file:
             self.file.write(text)
@@ -42,15 +55,23 @@ class StreamHandler:
         if self.callback:
             self.callback(text)
             
-        self._buffer.append(text)
+        if self._buffer is not None:
+            self._buffer.write(text)
+
+    def flush(self) -> None:
+        """Flush any text still held in the stdout or file buffers."""
+        if self.stream:
+            sys.stdout.flush()
+        if self.file:
+            self.file.flush()
         
     def getvalue(self) -> str:
         """Get all written text.
         
         Returns:
-            The concatenated text
+            The concatenated text, or "" if the handler does not buffer
         """
-        return "".join(self._buffer)
+        return self._buffer.getvalue() if self._buffer is not None else ""
         
     @contextmanager
     def capture(self):
@@ -62,5 +83,6 @@ class StreamHandler:
         try:
             yield self
         finally:
+            self.flush()
             if self.file:
                 self.file.close() 
\ No newline at end of file
@@ -1,5 +1,6 @@
 """Sequential decomposition of a task into N deterministic steps."""
 
+import hashlib
 import typer
 import sys
 from typing import List, Optional
@@ -10,6 +11,7 @@ from ..engine.llm_runner import run_llm
 from ..engine.models import resolve_model
 from ..engine.streaming import StreamHandler
 from ..engine.logging import log_step
+from ..engine.serialization import loads, compile_schema, JSONDecodeError, SchemaValidationError
 
 app = typer.Typer()
 
@@ -63,25 +65,47 @@ def chain(
     if len(prompt) < 2:
         raise typer.BadParameter("At least 2 prompts are required")
         
-    # Load gate schema if specified
-    schema = None
+    # Load gate schema if specified and compile its validator once
+    validator = None
     if gate_schema:
         with open(gate_schema) as f:
-            schema = json.load(f)
+            validator = compile_schema(json.load(f))
             
     # Execute chain
     result = ""
+    streamed = False
+    prev_input_hash = None
     for i, p in enumerate(prompt, 1):
+        # An empty step adds nothing; carry the previous result forward
+        if not p.strip():
+            log_step("chain_step_skip", {"index": i, "reason": "empty prompt"}, log_file)
+            continue
+
         # Append previous result to prompt
         if result:
             p = f"{p}\n\n{result}"
+
+        # Identical input to the previous step would just repeat its result
+        input_hash = hashlib.blake2b(p.encode(), digest_size=16).digest()
+        if input_hash == prev_input_hash:
+            log_step("chain_step_skip", {"index": i, "reason": "same input as previous step"}, log_file)
+            continue
+        prev_input_hash = input_hash
             
+        # Stream the final step to stdout as it arrives; with a gate schema
+        # the result is only printed once it has been validated
+        streamed = stream and i == len(prompt) and validator is None
+        handler = StreamHandler(buffer=False) if streamed else None
+
         # Run LLM
         result = run_llm(
             prompt=p,
             model=resolve_model(model),
             stream=stream,
+            handler=handler,
         )
+        if handler is not None:
+            handler.flush()
         
         # Log step
         log_step(
@@ -95,17 +119,17 @@ def chain(
         
         # Show intermediate results to stderr
         if i < len(prompt):
-            print(f"\n--- Step {i} Result ---", file=sys.stderr)
-            print(result, file=sys.stderr)
-            print(f"--- End Step {i} Result ---\n", file=sys.stderr)
+            sys.stderr.write(f"\n--- Step {i} Result ---\n{result}\n--- End Step {i} Result ---\n\n")
         
         # Validate against schema if specified
-        if schema:
+        if validator:
             try:
-                json_result = json.loads(result)
-                # TODO: Add schema validation
-            except json.JSONDecodeError:
+                validator(loads(result))
+            except (JSONDecodeError, SchemaValidationError):
                 raise typer.Exit(20)
                 
     # Print final result
-    print(result) 
+    if streamed:
+        print()
+    else:
+        print(result) 
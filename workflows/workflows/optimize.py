@@ -1,11 +1,11 @@
 """Evaluator-optimizer pattern implementation."""
 
-import json
 from pathlib import Path
-from typing import Optional
-from ..engine.llm_runner import run_llm
+from typing import Iterable, Optional
+from ..engine.llm_runner import run_llm, stream_llm
 from ..engine.models import resolve_model
 from ..engine.logging import setup_logging, log_step
+from ..engine.serialization import loads
 import typer
 
 app = typer.Typer()
@@ -14,9 +14,81 @@ EVALUATOR_SYSTEM_PROMPT = (
     "You are an evaluator. Given the following output and rubric, return a JSON object: {\"score\": float, \"feedback\": str}. "
     "Score must be between 0 and 1."
 )
-REVISE_TEMPLATE = (
-    "Revise the following output based on this feedback.\n\nOutput:\n{output}\n\nFeedback:\n{feedback}\n\nReturn the improved output only."
-)
+
+def _eval_prompt(output: str, rubric: str) -> str:
+    # The rubric is fixed for the run, so it goes before the changing output
+    # to extend the prefix shared by every evaluator call
+    return f"Rubric:\n{rubric}\n\nOutput to evaluate:\n{output}"
+
+def _revise_prompt(output: str, feedback: str) -> str:
+    return (
+        f"Revise the following output based on this feedback.\n\nOutput:\n{output}"
+        f"\n\nFeedback:\n{feedback}\n\nReturn the improved output only."
+    )
+
+# Evaluator chunks are grouped to roughly this many characters before scanning
+EVAL_SCAN_BATCH = 64
+
+class _JsonObjectScanner:
+    """Incremental brace matcher that finds the end of the first JSON object."""
+
+    def __init__(self) -> None:
+        self.start = -1
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def scan(self, text: str, begin: int) -> int:
+        """Scan text[begin:] and return the index just past the object, or -1."""
+        for i in range(begin, len(text)):
+            c = text[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '"':
+                self.in_string = self.start >= 0
+            elif c == "{":
+                if self.start < 0:
+                    self.start = i
+                self.depth += 1
+            elif c == "}" and self.start >= 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+def read_json_object(chunks: Iterable[str], batch_size: int = EVAL_SCAN_BATCH) -> str:
+    """Consume streamed chunks until the first top-level JSON object is complete.
+
+    Stops reading as soon as the object's closing brace arrives, so callers
+    can decode it without waiting for the rest of the response.
+
+    Args:
+        chunks: Streamed response text
+        batch_size: Minimum number of buffered characters between scans
+
+    Returns:
+        The text of the first complete JSON object, or everything read if none completed
+    """
+    scanner = _JsonObjectScanner()
+    text = ""
+    scanned = 0
+    for chunk in chunks:
+        text += chunk
+        if len(text) - scanned < batch_size:
+            continue
+        end = scanner.scan(text, scanned)
+        if end >= 0:
+            return text[scanner.start:end]
+        scanned = len(text)
+    end = scanner.scan(text, scanned)
+    if end >= 0:
+        return text[scanner.start:end]
+    return text.strip()
 
 @app.callback(invoke_without_command=True)
 def optimize(
@@ -78,15 +150,19 @@ def optimize(
 
     for iteration in range(1, max_iters + 1):
         # Evaluate
-        eval_prompt = f"Output to evaluate:\n{current_output}\n\nRubric:\n{rubric}"
-        eval_response = run_llm(
+        eval_prompt = _eval_prompt(current_output, rubric)
+        # Stream the evaluator and decode as soon as its JSON object closes
+        eval_stream = stream_llm(
             prompt=eval_prompt,
             system=EVALUATOR_SYSTEM_PROMPT,
             model=resolved_model,
-            stream=False,  # Evaluator output is JSON, don't stream
         )
         try:
-            eval_json = json.loads(eval_response)
+            eval_response = read_json_object(eval_stream)
+        finally:
+            eval_stream.close()
+        try:
+            eval_json = loads(eval_response)
             score = float(eval_json.get("score", 0.0))
             feedback = eval_json.get("feedback", "")
         except Exception as e:
@@ -105,7 +181,7 @@ def optimize(
             print(current_output)
             raise typer.Exit(30)
         # Revise
-        revise_prompt = REVISE_TEMPLATE.format(output=current_output, feedback=feedback)
+        revise_prompt = _revise_prompt(current_output, feedback)
         revised_output = run_llm(
             prompt=revise_prompt,
             model=resolved_model,
@@ -1,28 +1,42 @@
 """Orchestrator-workers pattern implementation (see spec §4.4)."""
 
 import typer
-from typing import Optional
+from typing import Optional, Dict, List, Any
 from pathlib import Path
-import json
-import asyncio
-import sys
 
-from ..engine.llm_runner import run_llm
+from ..engine.llm_runner import run_llm, batch_run_llm
 from ..engine.models import resolve_model
 from ..engine.logging import setup_logging, log_step
+from ..engine.serialization import loads
 
 try:
     import tiktoken
-    def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+except ImportError:
+    tiktoken = None
+
+# tiktoken encodings by model name, looked up once per process
+_ENCODING_CACHE: Dict[str, Any] = {}
+
+def _enc(model: str) -> Any:
+    if model not in _ENCODING_CACHE:
         try:
-            encoding = tiktoken.encoding_for_model(model)
+            _ENCODING_CACHE[model] = tiktoken.encoding_for_model(model)
         except Exception:
-            encoding = tiktoken.get_encoding("cl100k_base")
-        return len(encoding.encode(text))
-except ImportError:
-    def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
-        # Fallback: rough estimate (4 chars/token)
-        return max(1, len(text) // 4)
+            _ENCODING_CACHE[model] = tiktoken.get_encoding("cl100k_base")
+    return _ENCODING_CACHE[model]
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    if tiktoken is None:
+        # Fallback: rough estimate (4 chars/token, rounded up)
+        return (len(text) + 3) >> 2
+    # Worker output is plain text, so skip the special-token scan
+    return len(_enc(model).encode_ordinary(text))
+
+def count_tokens_batch(texts: List[str], model: str = "gpt-4o-mini") -> List[int]:
+    """Count tokens for several texts with a single batched encoder call."""
+    if tiktoken is None:
+        return [count_tokens(text, model) for text in texts]
+    return [len(tokens) for tokens in _enc(model).encode_ordinary_batch(texts)]
 
 app = typer.Typer()
 
@@ -68,9 +82,9 @@ def orchestrate(
             typer.echo(f"[orchestrate] LLM error: {e}", err=True)
             raise typer.Exit(20)
         try:
-            parsed = json.loads(orchestrator_response)
-            tasks = parsed.get("tasks", [])
-            aggregate_prompt = parsed.get("aggregate_prompt", None)
+            parsed = loads(orchestrator_response)
+            tasks = parsed.get("tasks") or []
+            aggregate_prompt = parsed.get("aggregate_prompt")
         except Exception as e:
             typer.echo(f"[orchestrate] Invalid orchestrator output: {e}", err=True)
             raise typer.Exit(10)
@@ -78,33 +92,46 @@ def orchestrate(
         if not tasks:
             typer.echo("[orchestrate] No tasks returned, finishing.", err=verbose)
             break
-        # 2. Run worker prompts concurrently
-        def run_worker(task):
-            try:
-                result = run_llm(
-                    prompt=task["prompt"],
-                    model=resolved_model,
-                    stream=stream,
-                )
-                if max_input_tokens is not None and count_tokens(result, resolved_model) > max_input_tokens:
-                    return {"id": task["id"], "result": None, "dropped": True}
-                return {"id": task["id"], "result": result, "dropped": False}
-            except Exception as e:
-                return {"id": task["id"], "result": str(e), "dropped": True}
-        async def run_all_workers():
-            sem = asyncio.Semaphore(max_workers)
-            async def sem_worker(task):
-                async with sem:
-                    return await asyncio.to_thread(run_worker, task)
-            return await asyncio.gather(*(sem_worker(task) for task in tasks))
+        # 2. Run worker prompts concurrently. A task without a prompt is
+        # dropped on its own rather than failing the whole batch.
+        prompts = [task.get("prompt") if isinstance(task, dict) else None for task in tasks]
         try:
-            worker_results = asyncio.run(run_all_workers())
+            outputs = iter(batch_run_llm(
+                [p for p in prompts if isinstance(p, str)],
+                model=resolved_model,
+                stream=stream,
+                max_concurrency=max_workers,
+                return_exceptions=True,
+            ))
         except Exception as e:
             typer.echo(f"[orchestrate] Worker execution error: {e}", err=True)
             raise typer.Exit(20)
+        responses = [
+            next(outputs) if isinstance(p, str) else ValueError("task has no prompt")
+            for p in prompts
+        ]
+        # Token counts for the successful outputs, in order, from one batched call
+        token_counts = iter(
+            count_tokens_batch(
+                [r for r in responses if not isinstance(r, Exception)], resolved_model
+            )
+            if max_input_tokens is not None
+            else ()
+        )
+        # Build the log records and the aggregation input in a single pass
+        worker_results = []
+        valid_results = []
+        for task, result in zip(tasks, responses):
+            task_id = task.get("id") if isinstance(task, dict) else None
+            if isinstance(result, Exception):
+                worker_results.append({"id": task_id, "result": str(result), "dropped": True})
+            elif max_input_tokens is not None and next(token_counts) > max_input_tokens:
+                worker_results.append({"id": task_id, "result": None, "dropped": True})
+            else:
+                worker_results.append({"id": task_id, "result": result, "dropped": False})
+                valid_results.append(result)
         log_step("worker_results", {"results": worker_results}, log_file)
         # 3. Aggregate results
-        valid_results = [w["result"] for w in worker_results if not w["dropped"] and w["result"] is not None]
         if not valid_results:
             typer.echo("[orchestrate] All worker outputs dropped or failed.", err=True)
             raise typer.Exit(20)
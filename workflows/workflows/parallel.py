@@ -6,22 +6,39 @@ This module implements the 'parallel' workflow, which supports two modes:
 """
 
 import asyncio
-import concurrent.futures
+import functools
+import os
 import re
 import sys
 import typer
+from collections import Counter
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional, Union, Dict, Any
-import json
+from typing import Iterable, Iterator, List, Optional, Sized, Union, Dict, Any
 
-from ..engine.llm_runner import run_llm
+try:
+    import re2  # google-re2: linear-time matching for large inputs
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.log_errors = False
+except ImportError:
+    re2 = None
+
+try:
+    import xxhash  # SIMD-accelerated hashing for long vote answers
+except ImportError:
+    xxhash = None
+
+from ..engine.llm_runner import async_run_llm, run_async
 from ..engine.models import resolve_model
+from ..engine.serialization import dumps
 from ..engine.streaming import StreamHandler
 from ..engine.logging import log_step
 
 app = typer.Typer()
 
+# Default cap on concurrent LLM requests (spec §3: min(32, cpu_count * 4))
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 class AggregateMode(str, Enum):
     """Aggregation modes for sectioning."""
     CONCAT = "concat"
@@ -31,68 +48,101 @@ class VoteMode(str, Enum):
     """Voting modes for parallel execution."""
     MAJORITY = "majority"
     MAX_TOKENS = "max-tokens"
+    SEMANTIC = "semantic"
+
+# Sentence-embedding model and cosine-similarity cutoff for semantic voting
+SEMANTIC_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_THRESHOLD = 0.85
 
 async def run_parallel_tasks(
-    prompts: List[str],
+    prompts: Iterable[str],
     model: Optional[str] = None,
     system: Optional[str] = None,
     max_workers: int = None,
     timeout: Optional[float] = None,
     log_file: Optional[Path] = None,
     verbose: bool = False,
+    cache: bool = True,
+    cache_prefix: Optional[str] = None,
 ) -> List[str]:
     """Run multiple prompts in parallel and return their results.
     
+    Prompts are pulled from the iterable as workers free up, so a lazily
+    generated sequence is never fully materialized: at most max_workers
+    prompts are queued ahead of the requests in flight.
+    
     Args:
-        prompts: List of prompts to run in parallel
+        prompts: Prompts to run in parallel (any iterable, consumed lazily)
         model: Model to use for all prompts
         system: System prompt to use for all prompts
         max_workers: Maximum number of concurrent workers
-        timeout: Maximum time to wait for each worker
+        timeout: Maximum time to wait for the whole batch
         log_file: Path to log file
         verbose: Whether to print verbose output
+        cache: Whether identical prompts may be served from the response cache
+        cache_prefix: Leading text every prompt shares, for provider prompt caching
         
     Returns:
         List of results from each prompt
     """
-    loop = asyncio.get_event_loop()
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = []
-        for i, prompt in enumerate(prompts):
-            future = loop.run_in_executor(
-                executor,
-                lambda p=prompt, idx=i: _run_task(p, idx, model, system, log_file, verbose)
+    # LLM calls are network-bound coroutines, so the cap only limits
+    # requests in flight; no thread is held per task
+    n_workers = max_workers or DEFAULT_MAX_WORKERS
+    # Every task uses the same model, so resolve it once up front
+    model = resolve_model(model)
+    total = len(prompts) if isinstance(prompts, Sized) else None
+    queue: asyncio.Queue = asyncio.Queue(maxsize=n_workers)
+    results: List[Optional[str]] = []
+    completed = 0
+    
+    async def produce() -> None:
+        for idx, prompt in enumerate(prompts):
+            results.append(None)
+            await queue.put((idx, prompt))
+        for _ in range(n_workers):
+            await queue.put(None)
+    
+    async def consume() -> None:
+        nonlocal completed
+        while (item := await queue.get()) is not None:
+            idx, prompt = item
+            results[idx] = await _arun_task(
+                prompt, idx, model, system, log_file, verbose, cache, cache_prefix
             )
-            futures.append(future)
-        
-        results = []
-        for i, future in enumerate(asyncio.as_completed(futures, timeout=timeout)):
-            result = await future
-            results.append(result)
+            completed += 1
             if verbose:
-                print(f"Task {i+1}/{len(prompts)} completed", file=sys.stderr)
-        
-        # Sort results by their original order
-        results.sort(key=lambda x: x[0])
-        return [r[1] for r in results]
+                print(f"Task {completed}/{total or len(results)} completed", file=sys.stderr)
+    
+    # Results land at their prompt's index, so they come back in prompt
+    # order. The timeout covers the whole batch; on expiry wait_for
+    # cancels the producer and every worker still running.
+    await asyncio.wait_for(
+        asyncio.gather(produce(), *(consume() for _ in range(n_workers))),
+        timeout=timeout,
+    )
+    return results
 
-def _run_task(
+async def _arun_task(
     prompt: str,
     task_id: int,
-    model: Optional[str] = None,
+    model: str,
     system: Optional[str] = None,
     log_file: Optional[Path] = None,
     verbose: bool = False,
-) -> tuple[int, str]:
-    """Run a single task and return its result with original index."""
+    cache: bool = True,
+    cache_prefix: Optional[str] = None,
+) -> str:
+    """Run a single task with an already-resolved model and return its result."""
     if verbose:
         print(f"Running task {task_id+1}", file=sys.stderr)
     
-    result = run_llm(
+    result = await async_run_llm(
         prompt=prompt,
-        model=resolve_model(model),
+        model=model,
         system=system,
         stream=False,  # No streaming for parallel tasks
+        cache=cache,
+        cache_prefix=cache_prefix,
     )
     
     # Log step
@@ -105,61 +155,165 @@ def _run_task(
         log_file,
     )
     
-    return task_id, result
+    return result
 
-def section_by_size(text: str, size: int) -> List[str]:
-    """Split text into chunks of approximately equal size."""
-    chunks = []
+def section_by_size(text: str, size: int) -> Iterator[str]:
+    """Split text into chunks of approximately equal size, lazily."""
     for i in range(0, len(text), size):
-        chunks.append(text[i:i+size])
-    return chunks
+        yield text[i:i+size]
 
-def section_by_regex(text: str, pattern: str) -> List[str]:
-    """Split text based on regex pattern."""
-    matches = re.split(f"({pattern})", text)
-    chunks = []
-    
-    # Combine headers with their content
-    i = 0
-    while i < len(matches):
-        if i + 1 < len(matches) and re.match(pattern, matches[i]):
-            chunks.append(matches[i] + matches[i+1])
-            i += 2
-        else:
-            if matches[i]:  # Skip empty matches
-                chunks.append(matches[i])
-            i += 1
-    
-    return chunks
+def section_by_size_bytes(data: memoryview, size: int) -> Iterator[memoryview]:
+    """Split UTF-8 bytes into zero-copy chunks of about size bytes, lazily.
+
+    Each cut is moved back to the nearest character boundary so no
+    multi-byte character is split between sections.
+    """
+    if size < 1:
+        raise ValueError(f"Section size must be at least 1 byte, got {size}")
+    start = 0
+    n = len(data)
+    while start < n:
+        end = min(start + size, n)
+        # Step back over UTF-8 continuation bytes (0b10xxxxxx)
+        while start < end < n and data[end] & 0xC0 == 0x80:
+            end -= 1
+        if end == start:
+            # size is smaller than this character; take the whole character
+            end += 1
+            while end < n and data[end] & 0xC0 == 0x80:
+                end += 1
+        yield data[start:end]
+        start = end
+
+@functools.lru_cache(maxsize=64)
+def _compile(pattern: str, ascii_text: bool = False) -> Any:
+    """Compile a section pattern once per process.
+
+    Uses RE2 when google-re2 is installed, the text to split is pure ASCII
+    and the pattern is within RE2's syntax (no lookaround or backreferences),
+    else the stdlib re engine. RE2's \\w, \\d, \\b and \\s only match ASCII,
+    so on other text it could silently find fewer sections than re.
+    """
+    if re2 is not None and ascii_text:
+        try:
+            return re2.compile(pattern, options=_RE2_OPTIONS)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
+def section_by_regex(text: str, pattern: str) -> Iterator[str]:
+    """Split text based on regex pattern, lazily.
+
+    Each section starts at a match and runs up to the next one; any text
+    before the first match forms its own leading section.
+    """
+    prev = 0
+    for m in _compile(pattern, text.isascii()).finditer(text):
+        # Zero-width or back-to-back matches can repeat a start; skip empty slices
+        if m.start() > prev:
+            yield text[prev:m.start()]
+            prev = m.start()
+    if len(text) > prev:
+        yield text[prev:]
 
 def aggregate_concat(results: List[str]) -> str:
-    """Concatenate results with newlines."""
-    return "\n\n".join(results)
+    """Concatenate non-empty results with blank lines between them."""
+    return "\n\n".join(r for r in results if r)
 
 def aggregate_json(results: List[str]) -> str:
     """Aggregate results as a JSON list."""
-    return json.dumps(results, indent=2)
+    return dumps(results, indent=True)
+
+def _answer_keys(results: List[str]) -> List[Any]:
+    """Return a compact key per answer for counting and deduplication.
+
+    With xxhash installed each answer is reduced to the 64-bit xxh3 digest
+    of its UTF-8 bytes, so counting compares small ints rather than long
+    strings. Otherwise the answers themselves are the keys.
+    """
+    if xxhash is None:
+        return results
+    hash64 = xxhash.xxh3_64_intdigest
+    return [hash64(r.encode()) for r in results]
+
+def dedupe_results(results: List[str]) -> List[str]:
+    """Drop repeated answers, keeping the first occurrence of each."""
+    seen = set()
+    return [
+        r for r, key in zip(results, _answer_keys(results))
+        if not (key in seen or seen.add(key))
+    ]
 
 def count_majority(results: List[str]) -> str:
-    """Return the most common result."""
-    counts = {}
-    for result in results:
-        counts[result] = counts.get(result, 0) + 1
-    
-    # Find the most common result
-    max_count = 0
-    max_result = ""
-    for result, count in counts.items():
-        if count > max_count:
-            max_count = count
-            max_result = result
-    
-    return max_result
+    """Return the most common result (ties go to the earliest answer)."""
+    if not results:
+        return ""
+    keys = _answer_keys(results)
+    winner, _ = Counter(keys).most_common(1)[0]
+    return results[keys.index(winner)]
 
 def max_tokens_result(results: List[str]) -> str:
     """Return the result with the most tokens."""
     return max(results, key=lambda x: len(x.split()))
 
+@functools.lru_cache(maxsize=1)
+def _embedding_model(name: str):
+    """Load a sentence-transformers model once per process."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        raise typer.BadParameter(
+            "--vote-mode semantic requires sentence-transformers "
+            "(pip install sentence-transformers)"
+        )
+    return SentenceTransformer(name)
+
+def semantic_majority(
+    results: List[str],
+    threshold: float = SEMANTIC_THRESHOLD,
+    model_name: str = SEMANTIC_MODEL,
+) -> str:
+    """Return the most central answer of the largest group of equivalent answers.
+
+    Answers are embedded in one batch and compared by cosine similarity, so
+    answers that differ only in wording or formatting vote together. Answers
+    are grouped greedily: each ungrouped answer, in order, starts a group with
+    every ungrouped answer at least ``threshold`` similar to it.
+
+    Args:
+        results: The vote answers
+        threshold: Minimum cosine similarity for two answers to match
+        model_name: sentence-transformers model used for the embeddings
+
+    Returns:
+        The answer of the largest group with the highest total similarity
+        to the rest of its group
+    """
+    if len(results) < 2:
+        return results[0] if results else ""
+    embeddings = _embedding_model(model_name).encode(
+        results,
+        batch_size=32,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+    # Embeddings are unit length, so one matrix product gives every cosine similarity
+    sim = embeddings @ embeddings.T
+    matches = sim >= threshold
+
+    ungrouped = matches.any(axis=1)  # every answer matches itself
+    best = None
+    for i in range(len(results)):
+        if not ungrouped[i]:
+            continue
+        members = (matches[i] & ungrouped).nonzero()[0]
+        ungrouped[members] = False
+        if best is None or len(members) > len(best):
+            best = members
+
+    medoid = sim[best][:, best].sum(axis=1).argmax()
+    return results[best[medoid]]
+
 @app.callback(invoke_without_command=True)
 def parallel(
     # Common options
@@ -195,7 +349,7 @@ def parallel(
     timeout: Optional[float] = typer.Option(
         None,
         "--timeout",
-        help="Maximum time to wait for each worker (in seconds)",
+        help="Maximum time to wait for all workers (in seconds)",
     ),
     log_file: Optional[Path] = typer.Option(
         None,
@@ -213,7 +367,8 @@ def parallel(
     section_size: Optional[int] = typer.Option(
         None,
         "--section",
-        help="Split input into chunks of this size",
+        min=1,
+        help="Split input into chunks of this many bytes",
     ),
     section_regex: Optional[str] = typer.Option(
         None,
@@ -257,15 +412,15 @@ def parallel(
     if not is_sectioning and not is_voting:
         raise typer.BadParameter("Either sectioning or voting mode must be specified")
     
-    # Read input
-    input_text = ""
+    # Read input as raw bytes; size-based sectioning slices them without
+    # decoding the whole input, regex sectioning decodes once
+    input_data = b""
     if input_file:
-        with open(input_file, "r") as f:
-            input_text = f.read()
+        input_data = input_file.read_bytes()
     else:
         # Read from stdin if no input file provided
         if not sys.stdin.isatty():
-            input_text = sys.stdin.read()
+            input_data = sys.stdin.buffer.read()
     
     # Process based on mode
     if is_sectioning:
@@ -273,21 +428,23 @@ def parallel(
         if aggregate is None:
             raise typer.BadParameter("--aggregate is required for sectioning mode")
         
-        # Split input into sections
-        sections = []
+        # Split input into sections; both splitters are lazy, so sections
+        # and their prompts are only built as workers become free. Every
+        # prompt starts with the same instruction, so providers can serve
+        # that prefix from their prompt cache.
         if section_size:
-            sections = section_by_size(input_text, section_size)
+            sections = (
+                str(chunk, "utf-8", "replace")
+                for chunk in section_by_size_bytes(memoryview(input_data), section_size)
+            )
         elif section_regex:
-            sections = section_by_regex(input_text, section_regex)
-        
-        if not sections:
-            raise typer.Exit("No sections found in input")
-        
-        # Prepare prompts for each section
-        prompts = [f"{prompt}\n\n{section}" for section in sections]
+            sections = section_by_regex(input_data.decode("utf-8", "replace"), section_regex)
+        else:
+            sections = iter(())
+        prompts = (f"{prompt}\n\n{section}" for section in sections)
         
         # Run in parallel
-        results = asyncio.run(run_parallel_tasks(
+        results = run_async(run_parallel_tasks(
             prompts=prompts,
             model=model,
             system=system,
@@ -295,8 +452,12 @@ def parallel(
             timeout=timeout,
             log_file=log_file,
             verbose=verbose,
+            cache_prefix=prompt,
         ))
         
+        if not results:
+            raise typer.Exit("No sections found in input")
+        
         # Aggregate results
         if aggregate == AggregateMode.CONCAT:
             final_result = aggregate_concat(results)
@@ -309,12 +470,15 @@ def parallel(
         # Validate voting options
         if vote_count < 2:
             raise typer.BadParameter("Vote count must be at least 2")
+        if vote_mode == VoteMode.SEMANTIC:
+            # Fail on a missing embedding backend before paying for the votes
+            _embedding_model(SEMANTIC_MODEL)
         
         # Prepare prompts (same prompt multiple times)
         prompts = [prompt] * vote_count
         
         # Run in parallel
-        results = asyncio.run(run_parallel_tasks(
+        results = run_async(run_parallel_tasks(
             prompts=prompts,
             model=model,
             system=system,
@@ -322,16 +486,19 @@ def parallel(
             timeout=timeout,
             log_file=log_file,
             verbose=verbose,
+            cache=False,  # Every vote must be an independent sample
         ))
         
         # Deduplicate if requested
         if dedupe:
-            results = list(dict.fromkeys(results))
+            results = dedupe_results(results)
         
         # Aggregate results based on vote mode
         if vote_mode == VoteMode.MAJORITY:
             final_result = count_majority(results)
         elif vote_mode == VoteMode.MAX_TOKENS:
             final_result = max_tokens_result(results)
+        elif vote_mode == VoteMode.SEMANTIC:
+            final_result = semantic_majority(results)
         
         print(final_result) 
\ No newline at end of file
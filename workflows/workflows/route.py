@@ -1,14 +1,25 @@
 """Route input to specialized handlers based on classification."""
 
-import json
+import functools
+import itertools
 import typer
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Iterator, Optional, Dict, Any, Tuple
+
+from ..engine.serialization import loads
 
 app = typer.Typer()
 
+FUSED_SYSTEM_PROMPT = (
+    "You are a router. Classify the input into exactly one of the provided labels, "
+    "then carry out the instructions given for that label."
+)
+
 def load_routes(routes_file: Path) -> Dict[str, Dict[str, str]]:
     """Load routing configuration from YAML or JSON file.
+
+    Parsed files are memoized per process until the file's mtime changes;
+    treat the returned mapping as read-only.
     
     Args:
         routes_file: Path to routes configuration file
@@ -16,11 +27,75 @@ def load_routes(routes_file: Path) -> Dict[str, Dict[str, str]]:
     Returns:
         Dictionary mapping labels to route configurations
     """
+    return _parse_routes(routes_file, routes_file.stat().st_mtime_ns)
+
+@functools.lru_cache(maxsize=8)
+def _parse_routes(routes_file: Path, mtime_ns: int) -> Dict[str, Dict[str, str]]:
+    """Parse a routes file; mtime_ns only keys the cache."""
     if routes_file.suffix == ".json":
-        return json.loads(routes_file.read_text())
+        return loads(routes_file.read_bytes())
     else:
         import yaml
-        return yaml.safe_load(routes_file.read_text())
+        # libyaml's C loader when PyYAML was built with it
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        return yaml.load(routes_file.read_bytes(), Loader=loader)
+
+def _fused_prompt(input_text: str, routes: Dict[str, Dict[str, str]]) -> str:
+    """Build one prompt that both classifies the input and handles it.
+
+    Each route's system prompt and filled-in template are embedded under its
+    label, and the model is asked to name its label on the first line. A
+    template that cannot be filled is reported and embedded as written, so
+    one bad route does not break routing to the others.
+    """
+    blocks = []
+    for label, route_config in routes.items():
+        template = route_config["template"]
+        try:
+            task = template.format(input=input_text)
+        except (KeyError, IndexError, ValueError) as e:
+            typer.echo(f"[route] Cannot fill template for route {label!r}: {e!r}", err=True)
+            task = template
+        block = f"## {label}\n"
+        if route_config.get("system"):
+            block += f"Role: {route_config['system']}\n"
+        block += f"Task: {task}"
+        blocks.append(block)
+    return (
+        f"Classify the following input into one of these categories: {', '.join(routes)}\n\n"
+        f"Input: {input_text}\n\n"
+        "Write the first line exactly as 'LABEL: <category>'. Starting on the next line, "
+        "respond to the task listed under that category below.\n\n"
+        + "\n\n".join(blocks)
+    )
+
+def _split_fused(chunks: Iterator[str]) -> Tuple[str, Iterator[str]]:
+    """Split a fused response into its label and an iterator over the rest.
+
+    Only the first line is consumed before returning, so the response body
+    can still be streamed as it arrives.
+    """
+    head = ""
+    for chunk in chunks:
+        # Blank lines before the label line are not part of it
+        head = (head + chunk).lstrip()
+        if "\n" in head:
+            break
+    first, _, rest = head.partition("\n")
+    label = first.strip()
+    if label[:6].upper() == "LABEL:":
+        label = label[6:].strip()
+
+    def body() -> Iterator[str]:
+        started = False
+        for piece in itertools.chain((rest,), chunks):
+            if not started:
+                piece = piece.lstrip()
+                if not piece:
+                    continue
+                started = True
+            yield piece
+    return label, body()
 
 @app.command()
 def main(
@@ -33,6 +108,7 @@ def main(
     stream: bool = typer.Option(True, help="Stream output"),
     log_file: Optional[Path] = typer.Option(None, help="Write execution log to file"),
     verbose: bool = typer.Option(False, help="Enable verbose logging"),
+    fused: bool = typer.Option(False, help="Classify and handle the input in a single LLM call"),
 ) -> None:
     """Classify input and dispatch to specialized handlers.
     
@@ -41,8 +117,12 @@ def main(
     - system: System prompt for the handler
     - model: Model override for this route
     - template: Prompt template with {input} placeholder
+
+    With --fused, one call both picks the label and writes the response,
+    saving a round trip; every route is then answered by --model.
     """
-    from ..engine.llm_runner import run_llm
+    from ..engine.llm_runner import run_llm, run_llm_choice, stream_llm
+    from ..engine.streaming import StreamHandler
     from ..engine.models import resolve_model
     from ..engine.logging import setup_logging, log_step
     
@@ -52,6 +132,33 @@ def main(
     # Load routes
     routes = load_routes(routes_file)
     labels = list(routes.keys())
+    default_model = resolve_model(model)
+
+    if fused:
+        fused_prompt = _fused_prompt(input_text, routes)
+        log_step("classify_and_handle", {"input": input_text, "labels": labels, "prompt": fused_prompt})
+        fused_system = classifier_system or FUSED_SYSTEM_PROMPT
+        if stream:
+            chunks = stream_llm(fused_prompt, model=default_model, system=fused_system)
+        else:
+            chunks = iter((run_llm(prompt=fused_prompt, system=fused_system, model=default_model, stream=False),))
+        try:
+            classification, body = _split_fused(chunks)
+            if classification not in routes:
+                raise typer.Exit(f"Classifier returned invalid label: {classification}")
+            log_step("handle", {"label": classification, "fused": True})
+
+            if print_label:
+                print(f"[{classification}] ", end="")
+            out = StreamHandler(buffer=False)
+            with out.capture():
+                for piece in body:
+                    out.write(piece)
+            print()
+        finally:
+            if stream:
+                chunks.close()
+        return
     
     # Build classifier prompt
     if classifier_prompt:
@@ -61,14 +168,14 @@ def main(
     
     # Run classifier
     log_step("classify", {"input": input_text, "labels": labels})
-    classification = run_llm(
+    classification = run_llm_choice(
         prompt=classifier_prompt,
+        choices=labels,
         system=classifier_system or "You are a classifier. Respond with exactly one of the provided labels, nothing else.",
-        model=resolve_model(model),
-        stream=stream
-    ).strip()
+        model=default_model,
+    )
     
-    # Validate classification
+    # A schema usually constrains the label, but nothing guarantees it; always validate
     if classification not in routes:
         raise typer.Exit(f"Classifier returned invalid label: {classification}")
     
@@ -83,7 +190,7 @@ def main(
     response = run_llm(
         prompt=handler_prompt,
         system=route_config.get("system"),
-        model=resolve_model(route_config.get("model", model)),
+        model=resolve_model(route_config["model"]) if route_config.get("model") else default_model,
         stream=stream
     )
     